@@ -12,7 +12,9 @@ from pathlib import Path
 from PIL import Image, ImageTk
 import logging
 import unicodedata
-from collections import Counter
+from array import array
+from bisect import bisect_left
+from collections import Counter, OrderedDict
 
 # Setup Logging
 # Setup Logging - Console only (hidden in GUI mode)
@@ -23,6 +25,10 @@ logging.basicConfig(
 
 CONFIG_FILE = Path(__file__).parent / "config.json"
 
+# Search cache limits (hit positions are 8 bytes each: page index + offset)
+SEARCH_CACHE_MAX_ENTRIES = 64
+SEARCH_CACHE_MAX_BYTES = 32 * 1024 * 1024
+
 def resource_path(relative_path):
     """ Get absolute path to resource, works for dev and for PyInstaller """
     try:
@@ -33,6 +39,70 @@ def resource_path(relative_path):
 
     return os.path.join(base_path, relative_path)
 
+class SearchCache:
+    """
+    LRU cache of normalized query -> (hit positions, built search output).
+    Hits are stored as two parallel typed arrays (page index, char offset) and
+    include overlapping occurrences, so a refined query that extends a cached
+    one can be answered by re-checking only the cached positions.
+    The output (result rows, hit pages, per-page counts) is kept as well, so a
+    repeated query skips rebuilding it.
+    """
+    def __init__(self, max_entries=SEARCH_CACHE_MAX_ENTRIES, max_bytes=SEARCH_CACHE_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.total_bytes = 0
+
+    @staticmethod
+    def _size(hits, output):
+        """Approximate memory footprint of an entry in bytes"""
+        pages, offsets = hits
+        results, hit_pages, page_hit_counts = output
+        size = pages.itemsize * len(pages) + offsets.itemsize * len(offsets)
+        size += hit_pages.itemsize * len(hit_pages) + page_hit_counts.itemsize * len(page_hit_counts)
+        size += sys.getsizeof(results)
+        for row in results:
+            size += sys.getsizeof(row) + sys.getsizeof(row[1]) # Context string dominates
+        return size
+
+    def get(self, query):
+        """Return (hits, output) for query, or None"""
+        entry = self.entries.get(query)
+        if entry is None:
+            return None
+        self.entries.move_to_end(query)
+        hits, output, _ = entry
+        return hits, output
+
+    def find_prefix(self, query):
+        """Return (prefix, hits) for the longest cached query that query extends, or None"""
+        best = None
+        for key in self.entries:
+            if len(key) < len(query) and query.startswith(key):
+                if best is None or len(key) > len(best):
+                    best = key
+        if best is None:
+            return None
+        self.entries.move_to_end(best)
+        return best, self.entries[best][0]
+
+    def put(self, query, hits, output):
+        size = self._size(hits, output)
+        if size > self.max_bytes:
+            return # Too large to keep, would evict everything else
+        if query in self.entries:
+            self.total_bytes -= self.entries.pop(query)[2]
+        self.entries[query] = (hits, output, size)
+        self.total_bytes += size
+        while len(self.entries) > self.max_entries or self.total_bytes > self.max_bytes:
+            _, (_, _, old_size) = self.entries.popitem(last=False)
+            self.total_bytes -= old_size
+
+    def clear(self):
+        self.entries.clear()
+        self.total_bytes = 0
+
 class PDFWikiApp:
     def __init__(self, root):
         self.root = root
@@ -58,6 +128,11 @@ class PDFWikiApp:
         self.current_pdf_path = None
         self.current_preview_image = None # Keep reference to prevent GC
         self.current_preview_page = None
+        self.search_cache = SearchCache()
+        
+        # Per-page hit summary of the last search (typed arrays for cheap summaries)
+        self.hit_pages = array('I')        # 1-based page number of each result row
+        self.page_hit_counts = array('I')  # hit count per page (0-based page index)
         
         # Setup Theme
         self.apply_theme_mode(self.current_theme_setting)
@@ -117,6 +192,7 @@ class PDFWikiApp:
             if self.current_theme_applied != expected_theme:
                 # Re-apply system theme to switch
                 self.apply_theme_mode("System")
+                self.draw_density_strip()
         
         # Check again in 2 seconds
         self.root.after(2000, self.check_system_theme)
@@ -124,6 +200,7 @@ class PDFWikiApp:
     def set_theme_command(self, mode):
         logging.info(f"Theme switched to: {mode}")
         self.apply_theme_mode(mode)
+        self.draw_density_strip()
 
     def setup_ui(self):
         # Menu Bar
@@ -186,6 +263,15 @@ class PDFWikiApp:
         self.search_btn.pack(fill=X)
         self.search_btn.config(state=DISABLED)
         
+        # Hit Density Strip (per-page histogram, click to jump)
+        density_frame = ttk.Frame(self.left_pane, padding=(10, 0))
+        density_frame.pack(fill=X)
+        
+        self.density_canvas = tk.Canvas(density_frame, height=24, highlightthickness=0, cursor="hand2")
+        self.density_canvas.pack(fill=X)
+        self.density_canvas.bind('<Configure>', lambda e: self.draw_density_strip())
+        self.density_canvas.bind('<Button-1>', self.on_density_click)
+        
         result_frame = ttk.Frame(self.left_pane, padding=10)
         result_frame.pack(fill=BOTH, expand=True)
         
@@ -243,9 +329,13 @@ class PDFWikiApp:
         logging.info(f"Loading PDF: {file_path}")
         self.current_pdf_path = file_path
         self.pdf_data = [] 
+        self.search_cache.clear() # Cached hits belong to the previous PDF
         self.hide_preview() 
         
         self.tree.delete(*self.tree.get_children())
+        self.hit_pages = array('I')
+        self.page_hit_counts = array('I')
+        self.draw_density_strip()
         self.search_entry.config(state=DISABLED)
         self.search_btn.config(state=DISABLED)
         self.load_btn.config(state=DISABLED)
@@ -330,6 +420,8 @@ class PDFWikiApp:
             self.root.after(0, self._load_reset)
 
     def _load_complete(self):
+        # perform_search skips empty pdf_data, so nothing should be cached here; clear to be safe
+        self.search_cache.clear()
         filename = os.path.basename(self.current_pdf_path) if self.current_pdf_path else ""
         self.progress_bar.configure(bootstyle="success") # Change to green on complete
         self.status_label.config(text=f"✔ 読み込み完了: {filename} ({len(self.pdf_data)} ページ)")
@@ -346,47 +438,178 @@ class PDFWikiApp:
         raw_query = self.search_entry.get().strip()
         if not raw_query:
             return
+        if not self.pdf_data:
+            return # Nothing loaded yet (or still loading)
         
         logging.info(f"Searching for: {raw_query}")
         query = unicodedata.normalize('NFKC', raw_query).lower()
         
         self.tree.delete(*self.tree.get_children())
-        results = []
         
-        for item in self.pdf_data:
-            page_text_lower = item['text'].lower()
-            
-            if query in page_text_lower:
-                # Find ALL occurrences in the page
-                start_search_idx = 0
-                hit_counter = 0
-                while True:
-                    idx = page_text_lower.find(query, start_search_idx)
-                    if idx == -1:
-                        break
-                    
-                    start_idx = max(0, idx - 20)
-                    end_idx = min(len(item['text']), idx + 20 + len(query))
-                    
-                    context_str = item['text'][start_idx:end_idx]
-                    
-                    context = ("..." if start_idx > 0 else "") + \
-                              context_str + \
-                              ("..." if end_idx < len(item['text']) else "")
-                    
-                    results.append((item['page'], context, hit_counter))
-                    
-                    # Move past this match
-                    start_search_idx = idx + len(query)
-                    hit_counter += 1
+        cached = self.search_cache.get(query)
+        if cached is None:
+            hits = self._find_hits(query)
+            output = self._build_results(query, hits)
+            self.search_cache.put(query, hits, output)
+        else:
+            logging.info("Search cache hit")
+            hits, output = cached
+        results, hit_pages, page_hit_counts = output
 
         logging.info(f"Found {len(results)} hits")
         for p, ctx, h_idx in results:
             self.tree.insert('', END, values=(f"P.{p}", ctx, h_idx))
+        
+        self.hit_pages = hit_pages
+        self.page_hit_counts = page_hit_counts
+        self.draw_density_strip()
             
         filename = os.path.basename(self.current_pdf_path) if self.current_pdf_path else ""
         self.status_label.config(text=f"検索結果: {len(results)} 件 (ファイル: {filename})")
 
+    def _build_results(self, query, hits):
+        """
+        Build result rows (page, context, hit index), the page of each row and
+        per-page hit counts from hit positions.
+        """
+        results = []
+        hit_pages = array('I')
+        page_hit_counts = array('I', [0]) * len(self.pdf_data)
+        
+        # Hits include overlapping occurrences; keep only non-overlapping ones
+        # per page (same order as _get_smart_crop_rect, so hit_index lines up)
+        last_page_idx = -1
+        next_start = 0
+        hit_counter = 0
+        for page_idx, idx in zip(*hits):
+            if page_idx != last_page_idx:
+                last_page_idx = page_idx
+                next_start = 0
+                hit_counter = 0
+            if idx < next_start:
+                continue
+            
+            item = self.pdf_data[page_idx]
+            start_idx = max(0, idx - 20)
+            end_idx = min(len(item['text']), idx + 20 + len(query))
+            
+            context_str = item['text'][start_idx:end_idx]
+            
+            context = ("..." if start_idx > 0 else "") + \
+                      context_str + \
+                      ("..." if end_idx < len(item['text']) else "")
+            
+            results.append((item['page'], context, hit_counter))
+            hit_pages.append(item['page'])
+            page_hit_counts[page_idx] += 1
+            
+            # Move past this match
+            next_start = idx + len(query)
+            hit_counter += 1
+        
+        return results, hit_pages, page_hit_counts
+
+    def _find_hits(self, query):
+        """
+        Find ALL occurrences (including overlapping) of query.
+        Returns parallel typed arrays (page index, char offset).
+        If query extends a cached query, only the cached positions are re-checked.
+        """
+        pages = array('I')
+        offsets = array('I')
+        
+        cached = self.search_cache.find_prefix(query)
+        if cached:
+            prefix, (cand_pages, cand_offsets) = cached
+            logging.info(f"Refining cached results for: {prefix}")
+            # Positions are grouped by page, so each touched page is lowered once
+            last_page_idx = -1
+            page_text_lower = ""
+            for page_idx, idx in zip(cand_pages, cand_offsets):
+                if page_idx != last_page_idx:
+                    last_page_idx = page_idx
+                    page_text_lower = self.pdf_data[page_idx]['text'].lower()
+                if page_text_lower.startswith(query, idx):
+                    pages.append(page_idx)
+                    offsets.append(idx)
+            return pages, offsets
+        
+        for page_idx, item in enumerate(self.pdf_data):
+            page_text_lower = item['text'].lower()
+            idx = page_text_lower.find(query)
+            while idx != -1:
+                pages.append(page_idx)
+                offsets.append(idx)
+                idx = page_text_lower.find(query, idx + 1)
+        return pages, offsets
+
+    def _density_bin_pages(self, x, width):
+        """Map an x coordinate on the density strip to a page index range [start, end)"""
+        n = len(self.page_hit_counts)
+        start = min(n - 1, max(0, x * n // width))
+        end = max(start + 1, min(n, (x + 1) * n // width))
+        return start, end
+
+    def draw_density_strip(self):
+        """
+        Draw per-page hit counts as a compact histogram.
+        When there are more pages than pixels, each column shows the busiest page it covers.
+        """
+        canvas = self.density_canvas
+        canvas.delete("all")
+        
+        colors = ttk.Style().colors
+        canvas.config(bg=colors.inputbg)
+        
+        width = canvas.winfo_width()
+        height = canvas.winfo_height()
+        n = len(self.page_hit_counts)
+        if n == 0 or width <= 1 or not self.hit_pages:
+            return
+        
+        max_count = max(self.page_hit_counts)
+        if n <= width:
+            # One bar per page
+            for page_idx, count in enumerate(self.page_hit_counts):
+                if count:
+                    x0 = page_idx * width / n
+                    x1 = max(x0 + 1, (page_idx + 1) * width / n)
+                    bar_h = max(2, height * count / max_count)
+                    canvas.create_rectangle(x0, height - bar_h, x1, height, fill=colors.primary, width=0)
+        else:
+            # One bar per pixel column
+            for x in range(width):
+                start, end = self._density_bin_pages(x, width)
+                count = max(self.page_hit_counts[start:end])
+                if count:
+                    bar_h = max(2, height * count / max_count)
+                    canvas.create_line(x, height - bar_h, x, height, fill=colors.primary)
+
+    def on_density_click(self, event):
+        """Jump to the first hit on the clicked page"""
+        width = self.density_canvas.winfo_width()
+        if not self.hit_pages or width <= 1:
+            return
+        
+        start, end = self._density_bin_pages(event.x, width)
+        for page_idx in range(start, end):
+            if self.page_hit_counts[page_idx]:
+                break
+        else:
+            return # No hits on the clicked page(s)
+        
+        # Rows are in page order, so the first row of this page is found by bisection
+        row = bisect_left(self.hit_pages, page_idx + 1)
+        children = self.tree.get_children()
+        if row >= len(children):
+            return
+        
+        iid = children[row]
+        self.tree.selection_set(iid)
+        self.tree.focus(iid)
+        self.tree.see(iid)
+        logging.info(f"Density jump to P.{page_idx + 1} (row {row})")
+
     def on_item_double_click(self, event):
         selection = self.tree.selection()
         if not selection: